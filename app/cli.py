@@ -0,0 +1,53 @@
+"""Command-line entry points.
+
+    python -m app.cli worker --processes 4
+"""
+import argparse
+import multiprocessing
+import os
+
+from .config import settings
+
+
+def _worker_process(batch_size: int, drain: bool) -> None:
+    from .worker import run_worker
+    run_worker(batch_size=batch_size, drain=drain)
+
+
+def start_workers(processes: int, batch_size: int, drain: bool = False) -> None:
+    """Run `processes` tick workers and wait for them. Uses spawn so no DB connection crosses a fork."""
+    from .db import engine
+    from .migrations import init_db
+    init_db(engine)
+
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_worker_process, args=(batch_size, drain), name=f"tick-worker-{i}")
+             for i in range(processes)]
+    for p in procs:
+        p.start()
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.join()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Flight agent commands")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    worker = sub.add_parser("worker", help="run tick worker processes against the shared database")
+    worker.add_argument("-n", "--processes", type=int, default=os.cpu_count() or 1)
+    worker.add_argument("--batch-size", type=int, default=settings.worker_batch_size)
+    worker.add_argument("--drain", action="store_true", help="exit once no watches are due")
+
+    args = parser.parse_args(argv)
+    if args.command == "worker":
+        start_workers(args.processes, args.batch_size, args.drain)
+
+
+if __name__ == "__main__":
+    main()
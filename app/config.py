@@ -4,8 +4,27 @@ from typing import Optional
 
 class Settings(BaseModel):
     timezone: str = os.getenv("TIMEZONE", "America/Los_Angeles")
+    database_url: str = os.getenv("DATABASE_URL", "sqlite:///./flight_agent.db")
     amadeus_client_id: Optional[str] = os.getenv("AMADEUS_CLIENT_ID")
     amadeus_client_secret: Optional[str] = os.getenv("AMADEUS_CLIENT_SECRET")
     duffel_access_token: Optional[str] = os.getenv("DUFFEL_ACCESS_TOKEN")
+    # Tick fan-out: total worker threads, plus a cap on in-flight calls per provider
+    tick_workers: int = int(os.getenv("TICK_WORKERS", "16"))
+    amadeus_concurrency: int = int(os.getenv("AMADEUS_CONCURRENCY", "4"))
+    duffel_concurrency: int = int(os.getenv("DUFFEL_CONCURRENCY", "8"))
+    # Typical-price cache: quartiles older than the TTL are served stale and refreshed in the background
+    typical_ttl_seconds: int = int(os.getenv("TYPICAL_TTL_SECONDS", str(6 * 3600)))
+    typical_cache_size: int = int(os.getenv("TYPICAL_CACHE_SIZE", "10000"))
+    # Due-time scheduler: background due-only ticks inside the API process
+    scheduler_enabled: bool = os.getenv("SCHEDULER_ENABLED", "0") == "1"
+    scheduler_interval_seconds: float = float(os.getenv("SCHEDULER_INTERVAL_SECONDS", "60"))
+    min_poll_seconds: int = int(os.getenv("MIN_POLL_SECONDS", "600"))
+    error_retry_seconds: int = int(os.getenv("ERROR_RETRY_SECONDS", "900"))
+    volatility_window: int = int(os.getenv("VOLATILITY_WINDOW", "10"))
+    volatility_weight: float = float(os.getenv("VOLATILITY_WEIGHT", "4.0"))
+    # Row leases for multi-worker ticks
+    lease_seconds: int = int(os.getenv("LEASE_SECONDS", "300"))
+    worker_batch_size: int = int(os.getenv("WORKER_BATCH_SIZE", "200"))
+    worker_idle_seconds: float = float(os.getenv("WORKER_IDLE_SECONDS", "5"))
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
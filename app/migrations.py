@@ -0,0 +1,39 @@
+"""Bring an existing database up to the current models.
+
+`create_all()` only creates missing tables, so columns and indexes added to
+existing tables are listed here. Every step is idempotent and runs at startup.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from .db import Base
+from . import models  # noqa: F401  (registers tables on Base.metadata)
+
+# (table, column, DDL type)
+COLUMNS = [
+    ("watches", "next_due_at", "DATETIME"),
+    ("watches", "lease_owner", "VARCHAR(128)"),
+    ("watches", "lease_expires_at", "DATETIME"),
+]
+
+# (index name, table, columns)
+INDEXES = [
+    ("ix_watches_next_due_at", "watches", "next_due_at"),
+]
+
+
+def migrate(engine: Engine) -> None:
+    with engine.begin() as conn:
+        insp = inspect(conn)
+        tables = set(insp.get_table_names())
+        for table, column, ddl in COLUMNS:
+            if table in tables and column not in {c["name"] for c in insp.get_columns(table)}:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        for name, table, columns in INDEXES:
+            if table in tables:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+
+
+def init_db(engine: Engine) -> None:
+    Base.metadata.create_all(bind=engine)
+    migrate(engine)
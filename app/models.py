@@ -17,6 +17,9 @@ class Watch(Base):
     confirm_price: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     currency: Mapped[str] = mapped_column(String(3), default="USD")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+    next_due_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, index=True)  # NULL = poll on next run
+    lease_owner: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
     price_snapshots = relationship("PriceSnapshot", back_populates="watch", cascade="all, delete-orphan")
     alerts = relationship("Alert", back_populates="watch", cascade="all, delete-orphan")
@@ -28,10 +28,11 @@ class TypicalOut(BaseModel):
 
 class TickResult(BaseModel):
     watch_id: int
-    action: str  # NO_ACTION | AUTO_BOOKED | NEED_CONFIRM
-    price: float
+    action: str  # NO_ACTION | AUTO_BOOKED | NEED_CONFIRM | ERROR
+    price: Optional[float] = None
     currency: str
     typical: Optional[TypicalOut] = None # Fixed: TypicalOut | None -> Optional[TypicalOut]
+    error: Optional[str] = None  # set when action == ERROR
 
 class AlertOut(BaseModel):
     id: int
@@ -42,4 +43,13 @@ class AlertOut(BaseModel):
     created_at: datetime
 
 class ConfirmBookIn(BaseModel):
-    alert_id: int
\ No newline at end of file
+    alert_id: int
+
+class TypicalCacheStats(BaseModel):
+    size: int
+    hits: int
+    misses: int
+    stale_hits: int
+    refreshes: int
+    refresh_errors: int
+    pending_writes: int
@@ -0,0 +1,85 @@
+"""Expiring row leases on watches, so several tick workers can share one database.
+
+A worker claims a batch by stamping lease_owner/lease_expires_at in a single UPDATE;
+only rows with no lease or an expired one are eligible, so a crashed worker's rows
+come back on their own once its lease runs out.
+"""
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import settings
+from .scheduler import due_filter
+
+
+def new_worker_id(prefix: str = "worker") -> str:
+    return f"{prefix}-{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+def _unleased(now: datetime):
+    return or_(models.Watch.lease_expires_at.is_(None), models.Watch.lease_expires_at <= now)
+
+
+def claim_batch(db: Session, worker_id: str, now: datetime, limit: Optional[int] = None,
+                due_only: bool = True, after_id: Optional[int] = None) -> List[models.Watch]:
+    """Lease up to `limit` watches to worker_id and return them. Commits.
+
+    Without due_only every unleased watch is eligible; after_id restricts the claim to ids above it.
+    """
+    db.commit()  # start the claim in a fresh transaction so the UPDATE takes the write lock first
+    expires = now + timedelta(seconds=settings.lease_seconds)
+    conds = [_unleased(now)]
+    if due_only:
+        conds.append(due_filter(now))
+    if after_id is not None:
+        conds.append(models.Watch.id > after_id)
+    order = [models.Watch.next_due_at, models.Watch.id] if due_only else [models.Watch.id]
+    candidates = select(models.Watch.id).where(*conds).order_by(*order)
+    if limit:
+        candidates = candidates.limit(limit)
+    # the lease check is repeated in the outer WHERE so a row another worker grabbed
+    # between the subquery and the write is left alone
+    db.execute(
+        update(models.Watch)
+        .where(models.Watch.id.in_(candidates.scalar_subquery()), _unleased(now))
+        .values(lease_owner=worker_id, lease_expires_at=expires),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+    return (db.query(models.Watch)
+            .filter(models.Watch.lease_owner == worker_id, models.Watch.lease_expires_at == expires)
+            .order_by(models.Watch.id).all())
+
+
+def renew(db: Session, worker_id: str, watch_ids: Iterable[int], now: datetime) -> Set[int]:
+    """Push our leases out again; returns the ids we still hold (others were reclaimed). Does not commit."""
+    watch_ids = list(watch_ids)
+    if not watch_ids:
+        return set()
+    db.execute(
+        update(models.Watch)
+        .where(models.Watch.id.in_(watch_ids), models.Watch.lease_owner == worker_id)
+        .values(lease_expires_at=now + timedelta(seconds=settings.lease_seconds)),
+        execution_options={"synchronize_session": False},
+    )
+    return set(db.scalars(select(models.Watch.id).where(
+        models.Watch.id.in_(watch_ids), models.Watch.lease_owner == worker_id)))
+
+
+def release(db: Session, worker_id: str, watch_ids: Iterable[int]) -> None:
+    """Drop our leases on watch_ids. Does not commit."""
+    watch_ids = list(watch_ids)
+    if not watch_ids:
+        return
+    db.execute(
+        update(models.Watch)
+        .where(models.Watch.id.in_(watch_ids), models.Watch.lease_owner == worker_id)
+        .values(lease_owner=None, lease_expires_at=None),
+        execution_options={"synchronize_session": False},
+    )
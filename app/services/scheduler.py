@@ -0,0 +1,119 @@
+"""Due-time scheduling: each watch carries next_due_at, worked out from days-to-departure and price volatility."""
+import logging
+import statistics
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import settings
+
+log = logging.getLogger(__name__)
+
+# (departure within N days, base polling interval); further out than the last band polls daily
+BANDS = [
+    (3, timedelta(minutes=30)),
+    (14, timedelta(hours=2)),
+    (60, timedelta(hours=6)),
+    (180, timedelta(hours=12)),
+]
+FAR_OUT = timedelta(hours=24)
+
+
+def base_interval(days_out: int) -> timedelta:
+    for limit, interval in BANDS:
+        if days_out <= limit:
+            return interval
+    return FAR_OUT
+
+
+def poll_interval(days_out: int, volatility: float = 0.0) -> timedelta:
+    """Closer departures and jumpier prices poll more often, never faster than MIN_POLL_SECONDS."""
+    interval = base_interval(days_out) / (1 + settings.volatility_weight * volatility)
+    return max(interval, timedelta(seconds=settings.min_poll_seconds))
+
+
+def volatility(db: Session, watch_ids: Iterable[int]) -> Dict[int, float]:
+    """Coefficient of variation of each watch's last VOLATILITY_WINDOW snapshot prices."""
+    watch_ids = list(watch_ids)
+    totals: Dict[int, List[float]] = {}
+    for i in range(0, len(watch_ids), 500):
+        ranked = select(
+            models.PriceSnapshot.watch_id,
+            models.PriceSnapshot.total,
+            func.row_number().over(partition_by=models.PriceSnapshot.watch_id,
+                                   order_by=models.PriceSnapshot.id.desc()).label("rn"),
+        ).where(models.PriceSnapshot.watch_id.in_(watch_ids[i:i + 500])).subquery()
+        rows = db.execute(select(ranked.c.watch_id, ranked.c.total).where(ranked.c.rn <= settings.volatility_window))
+        for watch_id, total in rows:
+            totals.setdefault(watch_id, []).append(total)
+    out = {}
+    for watch_id, xs in totals.items():
+        mean = statistics.fmean(xs)
+        out[watch_id] = statistics.pstdev(xs) / mean if len(xs) > 1 and mean else 0.0
+    return out
+
+
+def due_filter(now: datetime):
+    return and_(
+        or_(models.Watch.next_due_at.is_(None), models.Watch.next_due_at <= now),
+        models.Watch.departure_date >= now.date(),
+    )
+
+
+def due_watches(db: Session, now: datetime, limit: Optional[int] = None) -> List[models.Watch]:
+    q = db.query(models.Watch).filter(due_filter(now)).order_by(models.Watch.next_due_at, models.Watch.id)
+    if limit:
+        q = q.limit(limit)
+    return q.all()
+
+
+def reschedule(db: Session, watches, now: datetime, failed: Iterable[int] = ()) -> None:
+    """Set next_due_at for watches just polled. Failed watches retry after ERROR_RETRY_SECONDS. Does not commit."""
+    watches = list(watches)
+    if not watches:
+        return
+    failed = set(failed)
+    vol = volatility(db, [w.id for w in watches])
+    retry = timedelta(seconds=settings.error_retry_seconds)
+    rows = []
+    for w in watches:
+        if w.id in failed:
+            rows.append({"id": w.id, "next_due_at": now + retry})
+        else:
+            days_out = (w.departure_date - now.date()).days
+            rows.append({"id": w.id, "next_due_at": now + poll_interval(days_out, vol.get(w.id, 0.0))})
+    db.execute(update(models.Watch), rows)
+
+
+class TickScheduler:
+    """Background thread that runs a due-only tick every `interval_seconds`."""
+
+    def __init__(self, run: Callable[[], object], interval_seconds: float):
+        self.run = run
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="tick-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run()
+            except Exception:
+                log.exception("scheduled tick failed")
+            self._stop.wait(self.interval_seconds)
@@ -0,0 +1,281 @@
+"""Tick engine: fan provider calls out across watches, then write everything in one pass."""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, List, Optional, Set
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import settings
+from ..schemas import TickResult, TypicalOut
+from .providers import get_typical_price_amadeus, search_live_offers_duffel, book_with_duffel
+from .rules import evaluate_rules
+from .leases import claim_batch, new_worker_id, release, renew
+from .scheduler import reschedule
+from .typicals import typical_cache
+
+
+@dataclass(frozen=True)
+class WatchParams:
+    """Plain copy of the Watch fields the provider calls need (safe to hand to threads)."""
+    id: int
+    origin: str
+    destination: str
+    departure_date: date
+    pax: int
+    cabin: str
+    currency: str
+    auto_book_price: Optional[float]
+    confirm_price: Optional[float]
+
+    @classmethod
+    def from_watch(cls, w: models.Watch) -> "WatchParams":
+        return cls(
+            id=w.id, origin=w.origin, destination=w.destination, departure_date=w.departure_date,
+            pax=w.pax, cabin=w.cabin, currency=w.currency,
+            auto_book_price=w.auto_book_price, confirm_price=w.confirm_price,
+        )
+
+
+@dataclass
+class WatchQuote:
+    """Everything the provider phase learned about one watch."""
+    watch: WatchParams
+    typical: Optional[dict] = None
+    best: Optional[dict] = None
+    action: str = "NONE"  # AUTO | CONFIRM | NONE
+    order_info: Optional[dict] = None
+    error: Optional[str] = None
+
+
+class ProviderLimits:
+    """Per-provider caps on in-flight calls, shared by all tick worker threads."""
+
+    def __init__(self, amadeus: int, duffel: int):
+        self.amadeus = threading.BoundedSemaphore(max(1, amadeus))
+        self.duffel = threading.BoundedSemaphore(max(1, duffel))
+
+    @classmethod
+    def from_settings(cls) -> "ProviderLimits":
+        return cls(settings.amadeus_concurrency, settings.duffel_concurrency)
+
+
+def search_key(p: WatchParams) -> tuple:
+    return (p.origin, p.destination, p.departure_date, p.pax, p.cabin, p.currency)
+
+
+def typical_key(p: WatchParams) -> tuple:
+    # Quartiles only depend on OD+date (and the currency they're quoted in)
+    return (p.origin, p.destination, p.departure_date, p.currency)
+
+
+def fetch_typical(key: tuple, limits: ProviderLimits) -> dict:
+    origin, destination, departure_date, currency = key
+    with limits.amadeus:
+        return get_typical_price_amadeus(origin, destination, departure_date.isoformat(), currency)
+
+
+def _fetch_and_cache_typical(key: tuple, limits: ProviderLimits) -> dict:
+    value = fetch_typical(key, limits)
+    typical_cache.put(key, value)
+    return value
+
+
+def _limited(sem: threading.BoundedSemaphore, fn, *args, **kwargs):
+    with sem:
+        return fn(*args, **kwargs)
+
+
+def _error(e: Exception) -> str:
+    return f"{type(e).__name__}: {e}"
+
+
+def collect_quotes(watches: List[WatchParams], limits: Optional[ProviderLimits] = None,
+                   known_typicals: Optional[Dict[tuple, dict]] = None) -> List[WatchQuote]:
+    """Run provider calls for all watches concurrently; results come back in input order.
+
+    Watches sharing a search key (or an OD+date for typicals) share one provider call.
+    Typicals already in known_typicals are not fetched again.
+    """
+    if not watches:
+        return []
+    limits = limits or ProviderLimits.from_settings()
+    workers = max(1, settings.tick_workers)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tick") as pool:
+        # 1) typical price + live offers, one call per distinct key
+        known_typicals = known_typicals or {}
+        typicals = {}
+        for p in watches:
+            k = typical_key(p)
+            if k in typicals:
+                continue
+            if k in known_typicals:
+                typicals[k] = Future()
+                typicals[k].set_result(known_typicals[k])
+            else:
+                typicals[k] = pool.submit(_fetch_and_cache_typical, k, limits)
+        searches = {}
+        for p in watches:
+            k = search_key(p)
+            if k not in searches:
+                searches[k] = pool.submit(_limited, limits.duffel, search_live_offers_duffel,
+                                          p.origin, p.destination, p.departure_date.isoformat(), p.pax, p.cabin, p.currency)
+
+        # 2) rules, fanned back out to every watch
+        quotes = []
+        bookings = {}
+        for p in watches:
+            q = WatchQuote(watch=p)
+            quotes.append(q)
+            try:
+                q.typical = typicals[typical_key(p)].result()
+                offers = searches[search_key(p)].result()
+            except Exception as e:  # one bad route must not sink the tick
+                q.error = _error(e)
+                continue
+            if not offers:
+                continue
+            q.best = offers[0]
+            q.action = evaluate_rules(q.best["total"], p.currency, p.auto_book_price, p.confirm_price, q.typical)
+            if q.action == "AUTO":
+                bookings[id(q)] = pool.submit(_limited, limits.duffel, book_with_duffel, q.best["id"],
+                                              passenger_info={"type": "adult"}, payment_info={"test": True}, currency=p.currency)
+
+        # 3) bookings are per watch, never shared
+        for q in quotes:
+            f = bookings.get(id(q))
+            if f is None:
+                continue
+            try:
+                q.order_info = f.result()
+            except Exception as e:
+                q.error = _error(e)
+    return quotes
+
+
+def order_values(watch_id: int, currency: str, order_info: dict) -> dict:
+    hold = order_info.get("hold_expires_at")
+    if isinstance(hold, str):  # providers hand back ISO-8601 strings
+        hold = datetime.fromisoformat(hold.replace("Z", "+00:00"))
+    return dict(
+        watch_id=watch_id,
+        provider_order_id=order_info.get("provider_order_id"),
+        status=order_info.get("status", "created"),
+        amount=order_info.get("amount"),
+        currency=order_info.get("currency", currency),
+        hold_expires_at=hold,
+    )
+
+
+def build_order(watch_id: int, currency: str, order_info: dict) -> models.Order:
+    return models.Order(**order_values(watch_id, currency, order_info))
+
+
+def _typical_out(p: WatchParams, tp: Optional[dict]) -> Optional[TypicalOut]:
+    if tp is None:
+        return None
+    return TypicalOut(
+        origin=p.origin, destination=p.destination, departure_date=p.departure_date,
+        p10=tp.get("p10"), p25=tp.get("p25"), p50=tp.get("p50"), p75=tp.get("p75"), currency=p.currency
+    )
+
+
+def apply_quotes(db: Session, quotes: List[WatchQuote]) -> List[TickResult]:
+    """Write snapshots, alerts and orders for a batch of quotes in a few bulk statements. Does not commit."""
+    priced = [q for q in quotes if not q.error and q.best]
+
+    # one multi-row INSERT .. RETURNING hands back snapshot ids in parameter order,
+    # so alerts can point at their snapshot without a flush per row
+    snap_ids: Dict[int, int] = {}
+    if priced:
+        ids = db.scalars(
+            insert(models.PriceSnapshot).returning(models.PriceSnapshot.id, sort_by_parameter_order=True),
+            [dict(watch_id=q.watch.id, provider="duffel", total=q.best["total"], currency=q.best["currency"], raw=q.best["raw"])
+             for q in priced],
+        ).all()
+        snap_ids = {id(q): snap_id for q, snap_id in zip(priced, ids)}
+
+    results: list[TickResult] = []
+    orders: list[dict] = []
+    alerts: list[dict] = []
+    for q in quotes:
+        p = q.watch
+        if q.error:
+            results.append(TickResult(watch_id=p.id, action="ERROR", currency=p.currency,
+                                      typical=_typical_out(p, q.typical), error=q.error))
+            continue
+
+        best = q.best
+        if not best:
+            continue
+        snap_id = snap_ids[id(q)]
+
+        if q.action == "AUTO":
+            order = order_values(p.id, p.currency, q.order_info or {})
+            orders.append(order)
+            msg = f"Auto‑booked at {best['total']} {p.currency} (vs median {q.typical.get('p50')}). Order {order['provider_order_id']}."
+            alerts.append(dict(watch_id=p.id, kind="AUTO_BOOKED", message=msg, snapshot_id=snap_id))
+
+        elif q.action == "CONFIRM":
+            msg = f"Price {best['total']} {p.currency} meets confirm threshold (vs median {q.typical.get('p50')}). Offer {best['id']}."
+            alerts.append(dict(watch_id=p.id, kind="NEED_CONFIRM", message=msg, snapshot_id=snap_id))
+
+        results.append(TickResult(
+            watch_id=p.id,
+            action="AUTO_BOOKED" if q.action == "AUTO" else ("NEED_CONFIRM" if q.action == "CONFIRM" else "NO_ACTION"),
+            price=best["total"],
+            currency=p.currency,
+            typical=_typical_out(p, q.typical),
+        ))
+
+    if orders:
+        db.execute(insert(models.Order), orders)
+    if alerts:
+        db.execute(insert(models.Alert), alerts)
+    return results
+
+
+def tick_watches(db: Session, rows: List[models.Watch], now: datetime,
+                 still_held: Optional[Callable[[List[int]], Set[int]]] = None) -> List[TickResult]:
+    """Poll `rows` and stage every write for them. Does not commit.
+
+    still_held, if given, is asked once the provider calls are done which watches we may
+    still write for (e.g. leases that haven't been reclaimed); the rest are dropped.
+    """
+    watches = [WatchParams.from_watch(w) for w in rows]
+    limits = ProviderLimits.from_settings()
+    known = typical_cache.lookup(db, (typical_key(p) for p in watches), lambda k: fetch_typical(k, limits))
+    db.commit()  # don't hold a read transaction open across the provider calls
+    quotes = collect_quotes(watches, limits, known)
+    if still_held is not None:
+        held = still_held([p.id for p in watches])
+        quotes = [q for q in quotes if q.watch.id in held]
+        watches = [p for p in watches if p.id in held]
+    results = apply_quotes(db, quotes)
+    reschedule(db, watches, now, failed=[q.watch.id for q in quotes if q.error])
+    typical_cache.flush(db)
+    return results
+
+
+def run_tick(db: Session, due_only: bool = True, now: Optional[datetime] = None) -> List[TickResult]:
+    """Poll watches that are due (or every watch with due_only=False) and commit the results.
+
+    The watches are leased for the duration, so concurrent ticks and workers never overlap.
+    """
+    now = now or datetime.now(timezone.utc)
+    worker_id = new_worker_id("tick")
+    rows = claim_batch(db, worker_id, now, due_only=due_only)
+    ids = [w.id for w in rows]
+    try:
+        results = tick_watches(db, rows, now, lambda ids: renew(db, worker_id, ids, now))
+        release(db, worker_id, ids)
+        db.commit()
+    except Exception:
+        db.rollback()
+        release(db, worker_id, ids)
+        db.commit()
+        raise
+    return results
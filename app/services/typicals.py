@@ -0,0 +1,160 @@
+"""Read-through cache for typical prices: in-process LRU in front of the typical_prices table."""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Optional
+
+from sqlalchemy import insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import settings
+
+# (origin, destination, departure_date, currency)
+TypicalKey = tuple
+Fetch = Callable[[TypicalKey], dict]
+
+QUARTILES = ("p10", "p25", "p50", "p75")
+
+
+def _select_rows(db: Session, ods) -> list:
+    ods = list(ods)
+    cols = tuple_(models.TypicalPrice.origin, models.TypicalPrice.destination, models.TypicalPrice.departure_date)
+    rows = []
+    for i in range(0, len(ods), 500):  # 3 bound params per key; stay under SQLite's variable limit
+        rows.extend(db.scalars(select(models.TypicalPrice).where(cols.in_(ods[i:i + 500]))))
+    return rows
+
+
+def _as_utc(dt: datetime) -> datetime:
+    # SQLite hands DateTime columns back naive; we always write UTC
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+class TypicalCache:
+    def __init__(self, max_entries: int, ttl_seconds: int, refresh_workers: int = 2):
+        self.max_entries = max_entries
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self._entries: "OrderedDict[TypicalKey, tuple[dict, datetime]]" = OrderedDict()
+        self._dirty: Dict[TypicalKey, tuple[dict, datetime]] = {}
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+        self._refresh_workers = refresh_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.hits = self.misses = self.stale_hits = self.refreshes = self.refresh_errors = 0
+
+    @classmethod
+    def from_settings(cls) -> "TypicalCache":
+        return cls(settings.typical_cache_size, settings.typical_ttl_seconds)
+
+    def _remember(self, key: TypicalKey, value: dict, updated_at: datetime) -> None:
+        self._entries[key] = (value, updated_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self, db: Session, keys: list) -> None:
+        """Pull rows for keys we don't hold in memory, in one query per chunk of keys."""
+        wanted = set(keys)
+        for tp in _select_rows(db, {(o, d, dd) for o, d, dd, _ in keys}):
+            key = (tp.origin, tp.destination, tp.departure_date, tp.currency)
+            if key in wanted and tp.p50 is not None:
+                self._remember(key, {k: getattr(tp, k) for k in QUARTILES} | {"currency": tp.currency},
+                               _as_utc(tp.updated_at))
+
+    def lookup(self, db: Session, keys: Iterable[TypicalKey], fetch: Fetch) -> Dict[TypicalKey, dict]:
+        """Return cached typicals for keys; stale ones are served and refreshed in the background.
+
+        Keys missing from both memory and the table are left out; the caller fetches them
+        and hands them back through put().
+        """
+        keys = list(dict.fromkeys(keys))
+        with self._lock:
+            missing = [k for k in keys if k not in self._entries]
+        if missing:
+            self._load(db, missing)
+
+        now = datetime.now(timezone.utc)
+        found, stale = {}, []
+        with self._lock:
+            for k in keys:
+                entry = self._entries.get(k)
+                if entry is None:
+                    self.misses += 1
+                    continue
+                self._entries.move_to_end(k)
+                value, updated_at = entry
+                found[k] = value
+                if now - updated_at < self.ttl:
+                    self.hits += 1
+                else:
+                    self.stale_hits += 1
+                    if k not in self._refreshing:
+                        self._refreshing.add(k)
+                        stale.append(k)
+            if stale and self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self._refresh_workers, thread_name_prefix="typical-refresh")
+        for k in stale:
+            self._pool.submit(self._refresh, k, fetch)
+        return found
+
+    def _refresh(self, key: TypicalKey, fetch: Fetch) -> None:
+        try:
+            value = fetch(key)
+        except Exception:
+            with self._lock:
+                self.refresh_errors += 1
+            return
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+        self.put(key, value)
+        with self._lock:
+            self.refreshes += 1
+
+    def put(self, key: TypicalKey, value: dict) -> None:
+        """Record a freshly fetched value; it is written back on the next flush()."""
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            self._remember(key, value, now)
+            self._dirty[key] = (value, now)
+
+    def flush(self, db: Session) -> int:
+        """Bulk-upsert values fetched since the last flush into typical_prices. Does not commit."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return 0
+        by_od = {(o, d, dd): (cur, v, ts) for (o, d, dd, cur), (v, ts) in dirty.items()}
+        existing = {(tp.origin, tp.destination, tp.departure_date): tp.id for tp in _select_rows(db, by_od)}
+        updates, inserts = [], []
+        for (o, d, dd), (cur, value, ts) in by_od.items():
+            row = {q: value.get(q) for q in QUARTILES} | {"currency": cur, "updated_at": ts}
+            if (o, d, dd) in existing:
+                updates.append(row | {"id": existing[(o, d, dd)]})
+            else:
+                inserts.append(row | {"origin": o, "destination": d, "departure_date": dd})
+        if updates:
+            db.execute(update(models.TypicalPrice), updates)
+        if inserts:
+            db.execute(insert(models.TypicalPrice), inserts)
+        return len(by_od)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "stale_hits": self.stale_hits, "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors, "pending_writes": len(self._dirty),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._dirty.clear()
+            self._refreshing.clear()
+            self.hits = self.misses = self.stale_hits = self.refreshes = self.refresh_errors = 0
+
+
+typical_cache = TypicalCache.from_settings()
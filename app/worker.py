@@ -0,0 +1,42 @@
+"""Tick worker loop: lease a batch of due watches, poll it, release it, repeat."""
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+from .config import settings
+from .db import SessionLocal
+from .services.leases import claim_batch, new_worker_id, release, renew
+from .services.tick import tick_watches
+
+log = logging.getLogger(__name__)
+
+
+def run_worker(worker_id: Optional[str] = None, batch_size: Optional[int] = None,
+               drain: bool = False, stop: Optional[threading.Event] = None) -> int:
+    """Process batches until `stop` is set (or, with drain=True, until nothing is due). Returns watches processed."""
+    worker_id = worker_id or new_worker_id()
+    batch_size = batch_size or settings.worker_batch_size
+    stop = stop or threading.Event()
+    processed = 0
+    with SessionLocal() as db:
+        while not stop.is_set():
+            now = datetime.now(timezone.utc)
+            rows = claim_batch(db, worker_id, now, limit=batch_size)
+            if not rows:
+                if drain:
+                    break
+                stop.wait(settings.worker_idle_seconds)
+                continue
+            ids = [w.id for w in rows]
+            try:
+                results = tick_watches(db, rows, now, lambda held: renew(db, worker_id, held, datetime.now(timezone.utc)))
+                release(db, worker_id, ids)
+                db.commit()
+                processed += len(results)
+            except Exception:
+                log.exception("worker %s: batch of %d watches failed", worker_id, len(ids))
+                db.rollback()
+                release(db, worker_id, ids)
+                db.commit()
+    return processed
@@ -0,0 +1,123 @@
+"""DB time per tick: bulk write path vs the old row-at-a-time path.
+
+Provider calls are taken out of the picture (quotes are synthesised up front), so
+the numbers are purely the typical-price read/upsert plus snapshot/alert/order writes
+and the final commit, against a fresh SQLite file.
+
+    python -m benchmarks.tick_db --sizes 1000 10000 100000
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.db import Base
+from app.services.tick import WatchParams, WatchQuote, apply_quotes, build_order, typical_key
+from app.services.typicals import TypicalCache
+
+AIRPORTS = ["SFO", "JFK", "LAX", "ORD", "SEA", "BOS", "ATL", "DEN", "MIA", "DFW"]
+
+
+def seed(session_factory, n: int, rng: random.Random) -> list[WatchParams]:
+    rows = []
+    for _ in range(n):
+        o, d = rng.sample(AIRPORTS, 2)
+        rows.append(dict(origin=o, destination=d, departure_date=date(2030, 1, 1) + timedelta(days=rng.randrange(60)),
+                         pax=1, cabin="ECONOMY", currency="USD", confirm_price=300.0, auto_book_price=160.0))
+    with session_factory() as db:
+        db.execute(insert(models.Watch), rows)
+        db.commit()
+        return [WatchParams.from_watch(w) for w in db.query(models.Watch)]
+
+
+def synth_quotes(watches: list[WatchParams], rng: random.Random) -> list[WatchQuote]:
+    quotes = []
+    for p in watches:
+        base = 150 + (hash(typical_key(p)) % 350)
+        total = float(rng.randint(120, 520))
+        action = "AUTO" if total <= 160 else ("CONFIRM" if total <= 300 else "NONE")
+        quotes.append(WatchQuote(
+            watch=p,
+            typical={"p10": base * 0.6, "p25": base * 0.8, "p50": float(base), "p75": base * 1.2, "currency": "USD"},
+            best={"id": f"off_{p.id}", "total": total, "currency": "USD", "raw": {"carrier": "XX", "legs": 1}},
+            action=action,
+            order_info={"status": "booked", "provider_order_id": f"ord_{p.id}", "amount": total, "currency": "USD",
+                        "hold_expires_at": datetime.now(timezone.utc).isoformat()} if action == "AUTO" else None,
+        ))
+    return quotes
+
+
+def legacy_write(db, quotes: list[WatchQuote]) -> None:
+    """The pre-bulk write path: a SELECT per watch for typicals and a flush per snapshot."""
+    for q in quotes:
+        p, tp_dict, best = q.watch, q.typical, q.best
+        tp = db.query(models.TypicalPrice).filter_by(origin=p.origin, destination=p.destination, departure_date=p.departure_date).first()
+        if not tp:
+            tp = models.TypicalPrice(origin=p.origin, destination=p.destination, departure_date=p.departure_date, currency=p.currency)
+            db.add(tp)
+        for k in ("p10", "p25", "p50", "p75"):
+            setattr(tp, k, tp_dict.get(k))
+        tp.updated_at = datetime.now(timezone.utc)
+        snap = models.PriceSnapshot(watch_id=p.id, provider="duffel", total=best["total"], currency=best["currency"], raw=best["raw"])
+        db.add(snap)
+        db.flush()
+        if q.action == "AUTO":
+            db.add(build_order(p.id, p.currency, q.order_info))
+            db.add(models.Alert(watch_id=p.id, kind="AUTO_BOOKED", message="auto", snapshot_id=snap.id))
+        elif q.action == "CONFIRM":
+            db.add(models.Alert(watch_id=p.id, kind="NEED_CONFIRM", message="confirm", snapshot_id=snap.id))
+    db.commit()
+
+
+def bulk_write(db, quotes: list[WatchQuote]) -> None:
+    cache = TypicalCache(max_entries=len(quotes), ttl_seconds=0)
+    known = cache.lookup(db, (typical_key(q.watch) for q in quotes), fetch=lambda k: {})
+    for q in quotes:
+        if typical_key(q.watch) not in known:
+            cache.put(typical_key(q.watch), q.typical)
+    apply_quotes(db, quotes)
+    cache.flush(db)
+    db.commit()
+
+
+def measure(write, n: int, seed_value: int) -> float:
+    """Seconds for the second of two ticks (typical_prices rows already exist by then)."""
+    rng = random.Random(seed_value)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        factory = sessionmaker(bind=engine, autoflush=False)
+        watches = seed(factory, n, rng)
+        elapsed = 0.0
+        for _ in range(2):
+            quotes = synth_quotes(watches, rng)
+            with factory() as db:
+                start = time.perf_counter()
+                write(db, quotes)
+                elapsed = time.perf_counter() - start
+        engine.dispose()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    report = []
+    for n in args.sizes:
+        before = measure(legacy_write, n, args.seed)
+        after = measure(bulk_write, n, args.seed)
+        report.append({"watches": n, "row_at_a_time_s": round(before, 3), "bulk_s": round(after, 3),
+                       "speedup": round(before / after, 1)})
+        print(json.dumps(report[-1]))
+
+
+if __name__ == "__main__":
+    main()
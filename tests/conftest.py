@@ -0,0 +1,34 @@
+import os
+import tempfile
+from datetime import date
+
+# Point the app at a throwaway database before anything imports app.db
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='flight_agent_test_')}/test.db")
+
+import pytest
+
+from app import models
+from app.db import Base, SessionLocal, engine
+from app.services.typicals import typical_cache
+
+
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    typical_cache.clear()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_watch(db):
+    def _make(origin="SFO", destination="JFK", departure_date=date(2030, 1, 15), **kw):
+        w = models.Watch(origin=origin, destination=destination, departure_date=departure_date, **kw)
+        db.add(w)
+        db.commit()
+        return w
+    return _make
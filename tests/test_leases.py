@@ -0,0 +1,59 @@
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func
+
+from app import models
+from app.cli import start_workers
+from app.config import settings
+from app.db import SessionLocal
+from app.services.leases import claim_batch
+
+NOW = datetime(2030, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def test_concurrent_claims_never_overlap(db, make_watch):
+    for _ in range(120):
+        make_watch()
+    claimed, lock = [], threading.Lock()
+
+    def worker(n):
+        with SessionLocal() as s:
+            while True:
+                rows = claim_batch(s, f"w{n}", NOW, limit=7)
+                if not rows:
+                    return
+                with lock:
+                    claimed.extend(w.id for w in rows)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(claimed) == 120
+    assert len(set(claimed)) == 120
+
+
+def test_expired_leases_are_reclaimed(db, make_watch):
+    for _ in range(3):
+        make_watch()
+    assert len(claim_batch(db, "crashed", NOW)) == 3
+    # still inside the lease window: nothing to take
+    assert claim_batch(db, "other", NOW + timedelta(seconds=settings.lease_seconds - 1)) == []
+    reclaimed = claim_batch(db, "other", NOW + timedelta(seconds=settings.lease_seconds + 1))
+    assert [w.lease_owner for w in reclaimed] == ["other"] * 3
+
+
+def test_worker_processes_poll_each_watch_once(db, make_watch):
+    for day in range(1, 41):
+        make_watch(departure_date=NOW.date() + timedelta(days=day), confirm_price=1.0)
+
+    start_workers(processes=3, batch_size=5, drain=True)
+
+    per_watch = Counter(dict(db.query(models.PriceSnapshot.watch_id, func.count()).group_by(models.PriceSnapshot.watch_id)))
+    assert len(per_watch) == 40
+    assert set(per_watch.values()) == {1}
+    assert db.query(models.Watch).filter(models.Watch.lease_owner.isnot(None)).count() == 0
@@ -0,0 +1,55 @@
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, inspect, text
+
+from app import models
+from app.migrations import migrate
+from app.services import scheduler, tick
+
+NOW = datetime(2030, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _stub_providers(monkeypatch, total=450.0):
+    monkeypatch.setattr(tick, "get_typical_price_amadeus", lambda *a: {"p25": 100.0, "p50": 200.0})
+    monkeypatch.setattr(tick, "search_live_offers_duffel",
+                        lambda *a: [{"id": "off_1", "total": total, "currency": "USD", "raw": {}}])
+
+
+def test_tick_only_polls_due_watches(db, make_watch, monkeypatch):
+    _stub_providers(monkeypatch)
+    soon = make_watch(departure_date=date(2030, 1, 3))
+    later = make_watch(departure_date=date(2030, 9, 1))
+    make_watch(departure_date=date(2029, 12, 1))  # already departed
+
+    assert {r.watch_id for r in tick.run_tick(db, now=NOW)} == {soon.id, later.id}
+    assert tick.run_tick(db, now=NOW + timedelta(minutes=5)) == []
+
+    db.expire_all()
+    assert db.get(models.Watch, soon.id).next_due_at < db.get(models.Watch, later.id).next_due_at
+    # the close-in watch comes due again well before the far-out one
+    assert [r.watch_id for r in tick.run_tick(db, now=NOW + timedelta(hours=1))] == [soon.id]
+
+
+def test_volatile_prices_poll_sooner(db, make_watch):
+    calm, jumpy = make_watch(), make_watch()
+    for total in (300, 301, 299, 300):
+        db.add(models.PriceSnapshot(watch_id=calm.id, provider="duffel", total=total, currency="USD"))
+    for total in (200, 400, 150, 380):
+        db.add(models.PriceSnapshot(watch_id=jumpy.id, provider="duffel", total=total, currency="USD"))
+    db.commit()
+
+    vol = scheduler.volatility(db, [calm.id, jumpy.id])
+    assert vol[calm.id] < 0.01 < vol[jumpy.id]
+    assert scheduler.poll_interval(30, vol[jumpy.id]) < scheduler.poll_interval(30, vol[calm.id])
+    assert scheduler.poll_interval(1, 10.0) >= timedelta(seconds=600)
+
+
+def test_migrate_adds_columns_to_old_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/old.db")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE watches (id INTEGER PRIMARY KEY, origin VARCHAR(3))"))
+    migrate(engine)
+    migrate(engine)  # idempotent
+    insp = inspect(engine)
+    assert "next_due_at" in {c["name"] for c in insp.get_columns("watches")}
+    assert "ix_watches_next_due_at" in {i["name"] for i in insp.get_indexes("watches")}
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import Counter
+from datetime import date
+
+from app import models
+from app.services import tick
+
+
+def _offers(total):
+    return [{"id": "off_1", "total": total, "currency": "USD", "raw": {"legs": 1}}]
+
+
+def _typical(*a, **kw):
+    return {"p10": 100.0, "p25": 200.0, "p50": 300.0, "p75": 400.0, "currency": "USD"}
+
+
+def test_tick_reports_failures_without_aborting(db, make_watch, monkeypatch):
+    ok = make_watch(confirm_price=500.0)
+    bad = make_watch(origin="LAX")
+
+    def search(origin, *a, **kw):
+        if origin == "LAX":
+            raise RuntimeError("provider down")
+        return _offers(450.0)
+
+    monkeypatch.setattr(tick, "get_typical_price_amadeus", _typical)
+    monkeypatch.setattr(tick, "search_live_offers_duffel", search)
+
+    results = {r.watch_id: r for r in tick.run_tick(db)}
+
+    assert results[ok.id].action == "NEED_CONFIRM"
+    assert results[bad.id].action == "ERROR"
+    assert "provider down" in results[bad.id].error
+    assert db.query(models.PriceSnapshot).count() == 1
+    assert db.query(models.Alert).filter_by(kind="NEED_CONFIRM").count() == 1
+
+
+def test_tick_respects_provider_concurrency(db, make_watch, monkeypatch):
+    for day in range(1, 13):
+        make_watch(departure_date=date(2030, 1, day))
+    in_flight, peak, lock = 0, 0, threading.Lock()
+
+    def search(*a, **kw):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return _offers(999.0)
+
+    monkeypatch.setattr(tick, "get_typical_price_amadeus", _typical)
+    monkeypatch.setattr(tick, "search_live_offers_duffel", search)
+
+    results = tick.collect_quotes(
+        [tick.WatchParams.from_watch(w) for w in db.query(models.Watch)],
+        tick.ProviderLimits(amadeus=4, duffel=3),
+    )
+
+    assert len(results) == 12
+    assert 1 < peak <= 3
+
+
+def test_tick_coalesces_identical_searches(db, make_watch, monkeypatch):
+    for _ in range(3):
+        make_watch(auto_book_price=500.0)
+    make_watch(cabin="BUSINESS")  # same OD+date, different search key
+    make_watch(departure_date=date(2030, 2, 1))
+    calls = Counter()
+
+    def typical(*a, **kw):
+        calls["typical"] += 1
+        return _typical()
+
+    def search(*a, **kw):
+        calls["search"] += 1
+        return _offers(450.0)
+
+    monkeypatch.setattr(tick, "get_typical_price_amadeus", typical)
+    monkeypatch.setattr(tick, "search_live_offers_duffel", search)
+
+    results = tick.run_tick(db)
+
+    assert len(results) == 5
+    assert calls == {"typical": 2, "search": 3}
+    # bookings are never shared between watches
+    assert db.query(models.Order).count() == 3
+    for alert in db.query(models.Alert):
+        assert db.get(models.PriceSnapshot, alert.snapshot_id).watch_id == alert.watch_id
@@ -0,0 +1,51 @@
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from app import models
+from app.services import tick
+from app.services.typicals import TypicalCache, typical_cache
+
+KEY = ("SFO", "JFK", date(2030, 1, 15), "USD")
+QUARTILES = {"p10": 100.0, "p25": 200.0, "p50": 300.0, "p75": 400.0, "currency": "USD"}
+
+
+def test_tick_reads_typicals_through_cache(db, make_watch, monkeypatch):
+    make_watch()
+    fetches = []
+    monkeypatch.setattr(tick, "get_typical_price_amadeus", lambda *a: fetches.append(a) or dict(QUARTILES))
+    monkeypatch.setattr(tick, "search_live_offers_duffel", lambda *a: [])
+
+    tick.run_tick(db)
+    tick.run_tick(db, due_only=False)
+
+    assert len(fetches) == 1
+    assert db.query(models.TypicalPrice).one().p50 == 300.0
+    stats = typical_cache.stats()
+    assert (stats["misses"], stats["hits"]) == (1, 1)
+
+    # a cold process picks the row up from the table instead of calling Amadeus
+    typical_cache.clear()
+    tick.run_tick(db, due_only=False)
+    assert len(fetches) == 1
+    assert typical_cache.stats()["hits"] == 1
+
+
+def test_stale_entries_are_served_then_refreshed(db):
+    db.add(models.TypicalPrice(origin="SFO", destination="JFK", departure_date=KEY[2], currency="USD",
+                               p10=1.0, p25=2.0, p50=3.0, p75=4.0,
+                               updated_at=datetime.now(timezone.utc) - timedelta(days=1)))
+    db.commit()
+    cache = TypicalCache(max_entries=10, ttl_seconds=3600)
+
+    found = cache.lookup(db, [KEY], lambda k: dict(QUARTILES))
+    assert found[KEY]["p50"] == 3.0
+
+    for _ in range(100):
+        if cache.stats()["refreshes"]:
+            break
+        time.sleep(0.01)
+    assert cache.lookup(db, [KEY], lambda k: dict(QUARTILES))[KEY]["p50"] == 300.0
+    assert cache.flush(db) == 1
+    db.commit()
+    assert db.query(models.TypicalPrice).one().p50 == 300.0
+    assert cache.stats()["stale_hits"] == 1